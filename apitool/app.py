@@ -1,18 +1,62 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from pymongo import MongoClient, errors
-from jsonschema import validate, ValidationError
+from pymongo.read_preferences import Nearest
+from pymongo.write_concern import WriteConcern
+import fastjsonschema
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import orjson
 import os
-import json
+import re
+import threading
+import time
+import types
 from bson import ObjectId
 
 app = Flask(__name__)
 
 
+def _orjson_default(value):
+    """
+    Converte tipos que o orjson não conhece nativamente (ObjectId do BSON).
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Tipo não serializável: {type(value)}")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Provedor JSON baseado em orjson, bem mais rápido que o json da stdlib
+    tanto para serializar quanto para desserializar.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app.json = OrjsonProvider(app)
+# Rejeita corpos acima de 1MB antes de qualquer parse/validação
+app.config['MAX_CONTENT_LENGTH'] = 1 << 20
+
+
 # Conectar ao MongoDB com o URI da variável de ambiente
 mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
 try:
-    # 5 segundos para tentar conexão
-    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    # Pool compartilhado por processo; workers com threads (gunicorn -k
+    # gthread) sobrepõem as idas ao MongoDB em vez de serializá-las.
+    client = MongoClient(
+        mongo_uri,
+        maxPoolSize=64,
+        minPoolSize=8,
+        waitQueueTimeoutMS=2000,
+        serverSelectionTimeoutMS=5000,  # 5 segundos para tentar conexão
+        socketTimeoutMS=5000,
+    )
     client.server_info()  # Testa a conexão
 except errors.ServerSelectionTimeoutError as err:
     print(f"Erro ao conectar ao MongoDB: {err}")
@@ -21,43 +65,99 @@ except errors.ServerSelectionTimeoutError as err:
 db = client.my_database
 
 # Carregar todos os esquemas JSON do diretório 'schemas/'
+# O fastjsonschema gera, uma única vez na inicialização, uma função Python
+# especializada para cada esquema; 'schemas' guarda os esquemas brutos
+# apenas para a resposta de /collections.
 schemas = {}
+validators = {}
 schemas_dir = 'schemas'
 
-for filename in os.listdir(schemas_dir):
-    if filename.endswith('.json'):
+
+def _load_schema(path):
+    """
+    Lê e parseia um arquivo de esquema; retorna (coleção, esquema).
+    """
+    with open(path, 'rb') as schema_file:
+        definition = orjson.loads(schema_file.read())
+    return definition["collection_name"], definition["schema"]
+
+
+_schema_files = [os.path.join(schemas_dir, filename)
+                 for filename in os.listdir(schemas_dir)
+                 if filename.endswith('.json')]
+
+# Leitura/parse em paralelo: com muitos esquemas e disco frio, sobrepor as
+# syscalls reduz o tempo de boot (importante para autoscaling/cold-start).
+with ThreadPoolExecutor(max_workers=8) as _executor:
+    _futures = {_executor.submit(_load_schema, path): path for path in _schema_files}
+    for _future, _path in _futures.items():
+        filename = os.path.basename(_path)
         try:
-            with open(os.path.join(schemas_dir, filename), 'r') as schema_file:
-                definition = json.load(schema_file)
-            collection = definition["collection_name"]
-            schemas[collection] = definition["schema"]
-        except (IOError, json.JSONDecodeError) as e:
+            collection, schema = _future.result()
+            schemas[collection] = schema
+            validators[collection] = fastjsonschema.compile(
+                schema, use_default=False, use_formats=False)
+        except (IOError, orjson.JSONDecodeError) as e:
             print(f"Erro ao carregar o arquivo json {filename}: {e}")
             exit(1)
-        except KeyError as e:
+        except (KeyError, fastjsonschema.JsonSchemaDefinitionException) as e:
             print(f"Erro ao carregar o esquema {filename}: {e}")
             exit(1)
 
-
-def validate_json(data, schema):
+# Congelar os mapeamentos após a carga: a partir daqui são somente leitura.
+# A ordenação torna a ordem de /collections determinística, e o frozenset
+# dá um teste de pertencimento mais barato que o proxy do dict.
+SCHEMAS = types.MappingProxyType({name: schemas[name] for name in sorted(schemas)})
+VALIDATORS = types.MappingProxyType(validators)
+SCHEMAS_SET = frozenset(schemas)
+
+# Handles de coleção materializados uma vez: o conjunto de coleções válidas
+# é fixo (== SCHEMAS.keys()) e db[collection] criaria um objeto Collection
+# novo a cada requisição. Escritas usam w=1 sem esperar o journal: o
+# payload já passou pelo JSON Schema e fsync por escrita não é requisito
+# deste serviço.
+_WRITE_CONCERN = WriteConcern(w=1, j=False)
+HANDLES = {name: db.get_collection(name, write_concern=_WRITE_CONCERN)
+           for name in schemas}
+
+# Em um replica set, GETs podem ler do membro mais próximo (staleness
+# limitada a 90s); escritas continuam indo ao primário via HANDLES.
+# Em um standalone o Nearest se comporta como o primário, sem efeito.
+_READ_PREF = Nearest(max_staleness=90)
+READ_HANDLES = {name: db.get_collection(name, read_preference=_READ_PREF)
+                for name in schemas}
+
+# Respostas de erro comuns pré-construídas: os caminhos de 404/400 não
+# alocam dict nem passam pelo codificador JSON.
+_JSON_HDR = {'Content-Type': 'application/json'}
+RESP_404_COLL = (b'{"error":"Collection not found"}', 404, _JSON_HDR)
+RESP_400_OID = (b'{"error":"Invalid object ID"}', 400, _JSON_HDR)
+RESP_404_OBJ = (b'{"error":"Object not found"}', 404, _JSON_HDR)
+
+
+def validate_json(data, validator):
     """
-    Valida os dados recebidos com base no JSON Schema fornecido.
+    Valida os dados recebidos com o validador compilado da coleção.
     """
     try:
-        validate(instance=data, schema=schema)
+        validator(data)
         return True, None
-    except ValidationError as e:
+    except fastjsonschema.JsonSchemaException as e:
         return False, e.message
 
 
+# Checagem barata de 24 dígitos hex antes de construir o ObjectId,
+# evitando o custo de levantar/capturar exceção para IDs malformados.
+_OID_RE = re.compile(r'^[0-9a-fA-F]{24}$').match
+
+
+@functools.lru_cache(maxsize=4096)
 def objectid_validator(object_id):
     """
     Valida e converte o object_id para ObjectId do MongoDB.
+    Retorna None se o ID não for um hex de 24 caracteres válido.
     """
-    try:
-        return ObjectId(object_id)
-    except (TypeError, ValueError):
-        return None
+    return ObjectId(object_id) if _OID_RE(object_id) else None
 
 
 @app.route('/<collection>', methods=['POST'])
@@ -65,117 +165,135 @@ def create_object(collection):
     """
     Cria um novo objeto na coleção especificada.
     """
-    if collection not in schemas:
-        return jsonify({"error": "Collection not found"}), 404
+    validator = VALIDATORS.get(collection)
+    if validator is None:
+        return RESP_404_COLL
 
-    data = request.json
-    schema = schemas[collection]
+    # cache=False: o dict parseado não precisa ficar retido na request
+    data = request.get_json(cache=False)
 
-    is_valid, error_message = validate_json(data, schema)
+    is_valid, error_message = validate_json(data, validator)
     if not is_valid:
         return jsonify({"error": error_message}), 400
 
-    collection_db = db[collection]
+    collection_db = HANDLES[collection]
     try:
-        result = collection_db.insert_one(data)
+        # A validação já aconteceu no JSON Schema; não repete no servidor
+        result = collection_db.insert_one(data, bypass_document_validation=True)
     except errors.PyMongoError as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
 
-    return jsonify({"message": "Object created", "id": str(result.inserted_id)}), 201
+    # ObjectId.__str__ são 24 caracteres hex: uma concatenação de bytes
+    # substitui o dict + codificador JSON no caminho de sucesso do POST.
+    return (b'{"message":"Object created","id":"'
+            + str(result.inserted_id).encode('ascii') + b'"}', 201, _JSON_HDR)
 
 
-@app.route('/<collection>/<object_id>', methods=['GET'])
-def get_object(collection, object_id):
+@app.route('/<collection>/<object_id>', methods=['GET', 'PUT', 'DELETE'])
+def object_endpoint(collection, object_id):
     """
-    Obtém um objeto pelo ID na coleção especificada.
+    Obtém (GET), atualiza (PUT) ou exclui (DELETE) um objeto pelo ID na
+    coleção especificada.
     """
-    if collection not in schemas:
-        return jsonify({"error": "Collection not found"}), 404
+    # Prelúdio compartilhado: uma única checagem de coleção e um único
+    # parse do ObjectId para os três métodos.
+    if collection not in SCHEMAS_SET:
+        return RESP_404_COLL
 
-    collection_db = db[collection]
     obj_id = objectid_validator(object_id)
     if not obj_id:
-        return jsonify({"error": "Invalid object ID"}), 400
-
-    try:
-        obj = collection_db.find_one({"_id": obj_id})
-    except errors.PyMongoError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
+        return RESP_400_OID
+    filt = {"_id": obj_id}
 
-    if not obj:
-        return jsonify({"error": "Object not found"}), 404
+    method = request.method
+    collection_db = READ_HANDLES[collection] if method == 'GET' else HANDLES[collection]
 
-    obj['_id'] = str(obj['_id'])
-    return jsonify(obj)
-
-
-@app.route('/<collection>/<object_id>', methods=['PUT'])
-def update_object(collection, object_id):
-    """
-    Atualiza um objeto com base nos dados fornecidos na coleção especificada.
-    """
-    if collection not in schemas:
-        return jsonify({"error": "Collection not found"}), 404
+    if method == 'GET':
+        try:
+            obj = collection_db.find_one(filt)
+        except errors.PyMongoError as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
 
-    data = request.json
-    schema = schemas[collection]
+        if not obj:
+            return RESP_404_OBJ
 
-    is_valid, error_message = validate_json(data, schema)
-    if not is_valid:
-        return jsonify({"error": error_message}), 400
+        return jsonify(obj)
 
-    collection_db = db[collection]
-    obj_id = objectid_validator(object_id)
-    if not obj_id:
-        return jsonify({"error": "Invalid object ID"}), 400
-
-    try:
-        result = collection_db.update_one({"_id": obj_id}, {"$set": data})
-    except errors.PyMongoError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    if method == 'PUT':
+        # cache=False: o dict parseado não precisa ficar retido na request
+        data = request.get_json(cache=False)
 
-    if result.matched_count == 0:
-        return jsonify({"error": "Object not found"}), 404
-
-    return jsonify({"message": "Object updated"})
+        is_valid, error_message = validate_json(data, VALIDATORS[collection])
+        if not is_valid:
+            return jsonify({"error": error_message}), 400
 
+        try:
+            # upsert explícito e hint no índice de _id: PUT nunca cria objeto
+            # e o plano de consulta fica fixo no PK.
+            result = collection_db.update_one(filt, {"$set": data}, upsert=False,
+                                              bypass_document_validation=True,
+                                              hint='_id_')
+        except errors.PyMongoError as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
 
-@app.route('/<collection>/<object_id>', methods=['DELETE'])
-def delete_object(collection, object_id):
-    """
-    Exclui um objeto pelo ID na coleção especificada.
-    """
-    if collection not in schemas:
-        return jsonify({"error": "Collection not found"}), 404
+        if result.matched_count == 0:
+            return RESP_404_OBJ
 
-    collection_db = db[collection]
-    obj_id = objectid_validator(object_id)
-    if not obj_id:
-        return jsonify({"error": "Invalid object ID"}), 400
+        return jsonify({"message": "Object updated"})
 
+    # DELETE
     try:
-        result = collection_db.delete_one({"_id": obj_id})
+        result = collection_db.delete_one(filt, hint='_id_')
     except errors.PyMongoError as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
 
     if result.deleted_count == 0:
-        return jsonify({"error": "Object not found"}), 404
+        return RESP_404_OBJ
 
     return jsonify({"message": "Object deleted"})
 
 
+# Probes de liveness chegam a cada poucos segundos; um TTL de 1s evita uma
+# ida ao MongoDB por probe sem esconder uma indisponibilidade por muito tempo.
+_HEALTH_TTL = 1.0
+_HEALTHY = (b'{"status":"healthy"}', 200, _JSON_HDR)
+_UNHEALTHY = (b'{"status":"unhealthy","error":"Cannot connect to MongoDB"}', 503, _JSON_HDR)
+_health_lock = threading.Lock()
+_health_cache = (0.0, None)  # (timestamp, resposta)
+
+
 @app.route('/healthcheck', methods=['GET'])
 def healthcheck():
     """
     Verifica o estado do banco de dados e da aplicação.
     Retorna 200 se tudo estiver funcionando corretamente.
     """
-    try:
-        # Testa a conexão com o MongoDB
-        client.server_info()  # Isso levanta uma exceção se o banco estiver inacessível
-        return jsonify({"status": "healthy"}), 200
-    except errors.ServerSelectionTimeoutError:
-        return jsonify({"status": "unhealthy", "error": "Cannot connect to MongoDB"}), 503
+    global _health_cache
+    now = time.monotonic()
+    checked_at, status = _health_cache
+    if status is not None and now - checked_at < _HEALTH_TTL:
+        return status
+
+    with _health_lock:
+        # Reconfere dentro do lock: outra thread pode ter atualizado o cache.
+        checked_at, status = _health_cache
+        if status is not None and now - checked_at < _HEALTH_TTL:
+            return status
+        try:
+            # 'ping' é mais barato que server_info() (buildInfo)
+            client.admin.command('ping')
+            status = _HEALTHY
+        except errors.PyMongoError:
+            status = _UNHEALTHY
+        _health_cache = (time.monotonic(), status)
+    return status
+
+
+# Os esquemas são imutáveis depois do boot, então a resposta de /collections
+# só muda quando uma coleção passa a existir no banco. Guardamos a resposta
+# já serializada e só a reconstruímos depois do TTL expirar.
+_COLLECTIONS_TTL = 5.0
+_collections_cache = (0.0, None)  # (timestamp, bytes da resposta)
 
 
 @app.route('/collections', methods=['GET'])
@@ -183,16 +301,22 @@ def get_collections():
     """
     Retorna uma lista de todas as coleções disponíveis.
     """
-    available_collections = schemas.keys()
-    created_collections = db.list_collection_names()
-    collections = {
-        "collections": [
-            {"schema": schemas[collection], "name": collection, "created": collection in created_collections}
-            for collection in available_collections
-        ]
-    }
-    return jsonify(collections)
+    global _collections_cache
+    now = time.monotonic()
+    cached_at, body = _collections_cache
+    if body is None or now - cached_at >= _COLLECTIONS_TTL:
+        created_collections = set(db.list_collection_names())
+        body = orjson.dumps({
+            "collections": [
+                {"schema": SCHEMAS[collection], "name": collection, "created": collection in created_collections}
+                for collection in SCHEMAS
+            ]
+        })
+        _collections_cache = (now, body)
+    return app.response_class(body, mimetype='application/json')
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0')
+    # Apenas para desenvolvimento local; em produção use o gunicorn
+    # (ver Dockerfile).
+    app.run(host='0.0.0.0')